@@ -1,43 +1,53 @@
 import os
-import json
+import orjson
 import glob
 
 # Configuration
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DB_PATH = os.path.join(BASE_DIR, 'db.json')
 EPISODES_DIR = os.path.join(BASE_DIR, 'docs', 'episodes')
+TEXT_DIR = os.path.join(BASE_DIR, 'tmp', 'text')
 
 def load_db():
     if os.path.exists(DB_PATH):
-        with open(DB_PATH, 'r') as f:
-            return json.load(f)
+        with open(DB_PATH, 'rb') as f:
+            return orjson.loads(f.read())
     return {"processed": [], "episodes": []}
 
 def save_db(db):
-    with open(DB_PATH, 'w') as f:
-        json.dump(db, f, indent=2)
+    tmp_path = DB_PATH + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(orjson.dumps(db, option=orjson.OPT_INDENT_2))
+    os.replace(tmp_path, DB_PATH)
 
 def main():
     print("Scanning for failed transcriptions...")
     db = load_db()
     
     # Track removals
-    removed_slugs = []
+    removed_slugs = set()
     removed_ids = []
     
     # 1. Scan files
     # We look for files smaller than 1.5KB (empty template or error message)
     # A real transcript is usually > 5KB
     bad_files = []
-    for root, dirs, files in os.walk(EPISODES_DIR):
-        for file in files:
-            if file.endswith(".html"):
-                path = os.path.join(root, file)
-                size = os.path.getsize(path)
-                
-                if size < 5000: # Threshold for "suspiciously small"
-                    print(f"Found bad file: {file} ({size} bytes)")
-                    bad_files.append((file, path))
+
+    def scan(path):
+        # DirEntry caches the stat result, so no extra syscall per file
+        with os.scandir(path) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    scan(entry.path)
+                elif entry.name.endswith(".html"):
+                    size = entry.stat().st_size
+
+                    if size < 5000: # Threshold for "suspiciously small"
+                        print(f"Found bad file: {entry.name} ({size} bytes)")
+                        bad_files.append((entry.name, entry.path))
+
+    if os.path.isdir(EPISODES_DIR):
+        scan(EPISODES_DIR)
 
     if not bad_files:
         print("No bad files found.")
@@ -46,12 +56,14 @@ def main():
     # 2. Process Removals
     for filename, path in bad_files:
         slug = filename.replace(".html", "")
-        removed_slugs.append(slug)
+        removed_slugs.add(slug)
         
-        # Remove file
+        # Remove file, and the plain text podtext.py cached for it, if any
+        txt_path = os.path.join(TEXT_DIR, os.path.basename(os.path.dirname(path)), f"{slug}.txt")
         try:
             os.remove(path)
             print(f"Deleted: {path}")
+            if os.path.exists(txt_path): os.remove(txt_path)
         except OSError as e:
             print(f"Error deleting {path}: {e}")
 
@@ -93,6 +105,9 @@ def main():
     # Update DB
     db['episodes'] = new_episodes
     
+    # Deleted pages need the feeds re-read, so drop the cached feed validators
+    db.pop('feed_state', None)
+    
     # Save
     save_db(db)
     print(f"Removed {original_count - len(new_episodes)} entries from database.")
@@ -1,6 +1,6 @@
-import feedparser
 import os
 import yaml
+from fastfeed import iter_entries
 
 # Load config to get the URL
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -12,9 +12,11 @@ with open(CONFIG_PATH, 'r') as f:
 for feed_conf in config['feeds']:
     url = feed_conf['url']
     print(f"Checking URL: {url}")
-    d = feedparser.parse(url)
-    print(f"Feed Title: {d.feed.get('title', 'Unknown')}")
-    print(f"Entries found: {len(d.entries)}")
-    
-    for i, entry in enumerate(d.entries[:5]):
-        print(f"[{i}] {entry.title} (ID: {entry.id})")
\ No newline at end of file
+    feed = {}
+    count = 0
+    for i, entry in enumerate(iter_entries(url, feed)):
+        if i < 5:
+            print(f"[{i}] {entry['title']} (ID: {entry['id']})")
+        count += 1
+    print(f"Feed Title: {feed.get('title', 'Unknown')}")
+    print(f"Entries found: {count}")
\ No newline at end of file
@@ -2,8 +2,8 @@ import os
 import json
 import time
 import requests
-import feedparser
 from slugify import slugify
+from fastfeed import iter_entries
 from dotenv import load_dotenv
 from google import genai
 from google.genai import types
@@ -26,14 +26,13 @@ def get_audio_url():
     
     url = config['feeds'][0]['url']
     print(f"Scanning feed: {url}")
-    d = feedparser.parse(url)
-    
-    for entry in d.entries:
-        if slugify(entry.title) == TARGET_SLUG:
-            print(f"Found episode: {entry.title}")
-            for link in entry.links:
-                if link.type == 'audio/mpeg':
-                    return link.href
+    # Stop reading the feed as soon as the target episode shows up
+    for entry in iter_entries(url):
+        if slugify(entry['title']) == TARGET_SLUG:
+            print(f"Found episode: {entry['title']}")
+            for link in entry['links']:
+                if link['type'] == 'audio/mpeg':
+                    return link['href']
     return None
 
 def main():
@@ -45,8 +44,8 @@ def main():
 
     print(f"Downloading {url}...")
     with requests.get(url, stream=True) as r:
-        with open(TEMP_FILE, 'wb') as f:
-            for chunk in r.iter_content(chunk_size=8192):
+        with open(TEMP_FILE, 'wb', buffering=1024*1024) as f:
+            for chunk in r.iter_content(chunk_size=1024*1024):
                 f.write(chunk)
 
     # 2. Upload
@@ -54,8 +53,11 @@ def main():
     file = client.files.upload(file=TEMP_FILE)
     print(f"Uploaded: {file.name}")
     
+    # Back off exponentially so short files are picked up quickly
+    delay = 0.5
     while file.state == "PROCESSING":
-        time.sleep(2)
+        time.sleep(delay)
+        delay = min(delay * 1.5, 5)
         file = client.files.get(name=file.name)
     
     if file.state != "ACTIVE":
@@ -0,0 +1,54 @@
+import requests
+import xml.etree.ElementTree as ET
+
+# Streaming RSS/Atom reader for the debug tools.
+# Unlike feedparser it never builds the whole document, so callers that only
+# need a few fields (or stop at the first match) don't pay for the full feed.
+
+ENTRY_TAGS = ('item', 'entry')
+
+def _local(tag):
+    return tag.rsplit('}', 1)[-1]
+
+def iter_entries(url, feed=None):
+    """Yields {"id", "title", "links"} dicts for each <item>/<entry> in the feed.
+
+    If a `feed` dict is passed, channel-level fields (currently "title") are
+    stored in it as they are encountered.
+    """
+    with requests.get(url, stream=True, timeout=30) as r:
+        r.raise_for_status()
+        r.raw.decode_content = True
+        depth = 0
+        for event, elem in ET.iterparse(r.raw, events=('start', 'end')):
+            tag = _local(elem.tag)
+            if event == 'start':
+                if tag in ENTRY_TAGS: depth += 1
+                continue
+
+            if tag not in ENTRY_TAGS:
+                if depth == 0 and tag == 'title' and feed is not None:
+                    feed.setdefault('title', (elem.text or '').strip())
+                continue
+
+            depth -= 1
+            entry = {"id": None, "title": "", "links": []}
+            link_text = None
+            for child in elem:
+                name = _local(child.tag)
+                if name == 'title':
+                    entry['title'] = (child.text or '').strip()
+                elif name in ('guid', 'id'):
+                    entry['id'] = (child.text or '').strip()
+                elif name == 'enclosure':
+                    entry['links'].append({"href": child.get('url'), "type": child.get('type')})
+                elif name == 'link':
+                    if child.get('href'):
+                        entry['links'].append({"href": child.get('href'), "type": child.get('type')})
+                    else:
+                        link_text = (child.text or '').strip()
+            if not entry['id']: entry['id'] = link_text
+
+            # Free the parsed subtree; we only keep what was extracted
+            elem.clear()
+            yield entry
@@ -1,7 +1,8 @@
 import os
-import json
+import orjson
 import yaml
 import feedparser
+from concurrent.futures import ThreadPoolExecutor
 from slugify import slugify
 
 # Configuration
@@ -16,29 +17,46 @@ def load_config():
 
 def load_db():
     if os.path.exists(DB_PATH):
-        with open(DB_PATH, 'r') as f:
-            return json.load(f)
+        with open(DB_PATH, 'rb') as f:
+            return orjson.loads(f.read())
     return {"processed": [], "episodes": []}
 
 def save_db(db):
-    with open(DB_PATH, 'w') as f:
-        json.dump(db, f, indent=2)
+    tmp_path = DB_PATH + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(orjson.dumps(db, option=orjson.OPT_INDENT_2))
+    os.replace(tmp_path, DB_PATH)
+
+def is_valid_transcript(path):
+    """True if the episode page exists and actually contains transcript paragraphs."""
+    try:
+        # Size is a cheap first reject; the marker catches small error pages that pass it
+        if os.stat(path).st_size <= 500: return False
+        with open(path, 'rb') as f:
+            return b'class="paragraph' in f.read()
+    except OSError:
+        return False
 
 def main():
     print("Repairing Database State...")
     config = load_config()
     db = load_db()
     
-    # 1. Build a map of Slug -> GUID from live feeds
-    print("Fetching feeds to map Slugs to IDs...")
-    slug_to_guid = {}
-    
-    for feed_conf in config['feeds']:
-        print(f"  - {feed_conf['name']}")
-        d = feedparser.parse(feed_conf['url'])
-        for entry in d.entries:
-            s = slugify(entry.title)
-            slug_to_guid[s] = entry.id
+    # 1. Build a map of Slug -> GUID
+    # Newer entries store their GUID, so only legacy ones need the live feeds
+    slug_to_guid = {ep['slug']: ep['guid'] for ep in db['episodes'] if ep.get('guid')}
+    missing = [ep['slug'] for ep in db['episodes'] if ep['slug'] not in slug_to_guid]
+
+    if missing:
+        print(f"Fetching feeds to map {len(missing)} legacy Slugs to IDs...")
+        feeds = config['feeds']
+        with ThreadPoolExecutor(max_workers=max(1, min(16, len(feeds)))) as ex:
+            parsed = list(ex.map(lambda fc: (fc, feedparser.parse(fc['url'])), feeds))
+        for feed_conf, d in parsed:
+            print(f"  - {feed_conf['name']}")
+            for entry in d.entries:
+                s = slugify(entry.title)
+                slug_to_guid.setdefault(s, entry.id)
 
     # 2. Check Database Episodes vs Files
     valid_episodes = []
@@ -54,7 +72,7 @@ def main():
             
         path = os.path.join(EPISODES_DIR, feed_slug, f"{ep['slug']}.html")
         
-        if os.path.exists(path) and os.path.getsize(path) > 500:
+        if is_valid_transcript(path):
             valid_episodes.append(ep)
         else:
             print(f"Missing/Broken file for: {ep['title']}")
@@ -84,10 +102,14 @@ def main():
     
     # We keep an ID if it's in the valid set OR if we couldn't resolve its slug (to be safe? No, let's be strict for cleanup).
     # Actually, if we can't resolve the slug, we might accidentally delete a valid ID.
-    # But since we just fetched the live feed, the mapping should be 100% complete for active episodes.
+    # But stored GUIDs plus the live feed fallback should make the mapping complete for active episodes.
     
     db['processed'] = list(valid_guids)
     
+    # Un-marked episodes must be picked up again, so drop the cached feed
+    # validators that would otherwise let podtext skip unchanged feeds
+    db.pop('feed_state', None)
+    
     removed_ids_count = original_processed_count - len(db['processed'])
     
     save_db(db)
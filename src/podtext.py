@@ -1,19 +1,34 @@
 import os
-import json
+import shutil
+import orjson
 import time
+import calendar
+import random
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import yaml
 import feedparser
 import subprocess
 import re
+import io
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from email.utils import formatdate
+from email.utils import formatdate, parsedate_to_datetime
 from slugify import slugify
-from jinja2 import Environment, FileSystemLoader
+from jinja2 import Environment, FileSystemLoader, FileSystemBytecodeCache
 from dotenv import load_dotenv
 from tqdm import tqdm
 from google import genai
 from google.genai import types
+from google.genai import errors as genai_errors
+
+try:
+    import pygit2
+except ImportError:
+    pygit2 = None
 
 # Load environment variables
 load_dotenv(os.path.join(os.path.dirname(os.path.dirname(__file__)), '.env'))
@@ -25,16 +40,40 @@ DB_PATH = os.path.join(BASE_DIR, 'db.json')
 OUTPUT_DIR = os.path.join(BASE_DIR, 'docs')
 EPISODES_DIR = os.path.join(OUTPUT_DIR, 'episodes')
 PODCASTS_DIR = os.path.join(OUTPUT_DIR, 'podcasts')
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates')
 TEMP_DIR = os.path.join(BASE_DIR, 'tmp')
 
+JINJA_CACHE_DIR = os.path.join(TEMP_DIR, 'jinja')
+TRANSCRIPTS_DIR = os.path.join(TEMP_DIR, 'transcripts')
+UPLOADS_DIR = os.path.join(TEMP_DIR, 'uploads')
+# Plain text of each episode's transcript, read by search and RSS. A build
+# cache, so it is kept out of the published docs/ tree
+TEXT_DIR = os.path.join(TEMP_DIR, 'text')
+
 # Ensure directories
-for d in [OUTPUT_DIR, EPISODES_DIR, PODCASTS_DIR, TEMP_DIR]:
+for d in [OUTPUT_DIR, EPISODES_DIR, PODCASTS_DIR, TEMP_DIR, JINJA_CACHE_DIR, TRANSCRIPTS_DIR, UPLOADS_DIR, TEXT_DIR]:
     os.makedirs(d, exist_ok=True)
 
+# Templates are compiled once per process and their bytecode is kept across runs
+_JENV = Environment(
+    loader=FileSystemLoader(TEMPLATES_DIR),
+    auto_reload=False,
+    cache_size=400,
+    bytecode_cache=FileSystemBytecodeCache(JINJA_CACHE_DIR)
+)
+
+# Shared HTTP session so consecutive downloads from the same CDN reuse connections.
+# Connection errors and 5xx responses are retried a few times with backoff
+_RETRY = Retry(total=3, backoff_factor=0.5, status_forcelist=(500, 502, 503, 504))
+_SESSION = requests.Session()
+_SESSION.mount('https://', HTTPAdapter(pool_connections=16, pool_maxsize=16, max_retries=_RETRY))
+_SESSION.mount('http://', HTTPAdapter(pool_connections=16, pool_maxsize=16, max_retries=_RETRY))
+
 HEBREW_MONTHS = [
     "ינואר", "פברואר", "מרץ", "אפריל", "מאי", "יוני",
     "יולי", "אוגוסט", "ספטמבר", "אוקטובר", "נובמבר", "דצמבר"
 ]
+HEBREW_MONTH_NUMBERS = {name: i + 1 for i, name in enumerate(HEBREW_MONTHS)}
 
 def format_hebrew_date(date_obj):
     """Converts a date object/string to Hebrew format (12 בינואר 2025)."""
@@ -53,9 +92,34 @@ def format_hebrew_date(date_obj):
     except Exception as e:
         return str(date_obj)
 
+def parse_episode_date(date_str):
+    """Parses a stored published_date ('12 בינואר 2025' or RFC 822) for sorting."""
+    try:
+        day, month_he, year = date_str.split(' ')[:3]
+        # No month name starts with 'ב', so the prefix can always be dropped
+        month = HEBREW_MONTH_NUMBERS.get(month_he.removeprefix('ב'))
+        if month: return datetime(int(year), month, int(day))
+    except (ValueError, AttributeError):
+        pass
+    try:
+        return parsedate_to_datetime(date_str).replace(tzinfo=None)
+    except (ValueError, TypeError):
+        return datetime.min
+
+def episode_sort_key(ep):
+    """Numeric publish time of an episode record, newest sorting highest."""
+    if 'published_ts' in ep: return ep['published_ts']
+    # Records saved before published_ts existed only have the display date
+    dt = parse_episode_date(ep.get('published_date', ''))
+    return calendar.timegm(dt.timetuple()) if dt != datetime.min else 0
+
 # Configure Gemini
 api_key = os.getenv("GEMINI_API_KEY")
 client = genai.Client(api_key=api_key) if api_key else None
+DEFAULT_MODEL = "gemini-3-flash-preview"
+
+# Newest entries checked per feed on each run
+MAX_ENTRIES = 200
 
 def load_config():
     with open(CONFIG_PATH, 'r') as f:
@@ -63,52 +127,107 @@ def load_config():
 
 def load_db():
     if os.path.exists(DB_PATH):
-        with open(DB_PATH, 'r') as f:
-            data = json.load(f)
+        with open(DB_PATH, 'rb') as f:
+            data = orjson.loads(f.read())
             if "failed" not in data: data["failed"] = []
+            if "feed_state" not in data: data["feed_state"] = {}
+            # Live uploads are tracked under tmp/uploads now
+            data.pop("gemini_uploads", None)
+            # Older runs left each transcript's text on its record; the pages
+            # and tmp/text already hold it, so it is not carried in db.json
+            for ep in data["episodes"]: ep.pop("content", None)
             return data
-    return {"processed": [], "episodes": [], "failed": []}
+    return {"processed": [], "episodes": [], "failed": [], "feed_state": {}}
 
 def save_db(db):
-    with open(DB_PATH, 'w') as f:
-        json.dump(db, f, indent=2)
+    # Write to a temp file and swap it in, so a crash never leaves a torn db.json
+    tmp_path = DB_PATH + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(orjson.dumps(db, option=orjson.OPT_INDENT_2))
+    os.replace(tmp_path, DB_PATH)
+
+TRANSCRIPT_START = '<!--TRANSCRIPT_START-->'
+TRANSCRIPT_END = '<!--TRANSCRIPT_END-->'
+_TRANSCRIPT_RE = re.compile(r'<div class="transcript-container" id="transcript">(.*?)</div>\s*<script>', re.DOTALL)
+_TAG_RE = re.compile(r'<[^<]+?>')
+
+def extract_transcript_html(html):
+    """Returns the transcript markup of an episode page, or None if not found."""
+    start = html.find(TRANSCRIPT_START)
+    if start != -1:
+        end = html.find(TRANSCRIPT_END, start)
+        if end != -1: return html[start + len(TRANSCRIPT_START):end].strip()
+    # Pages rendered before the markers were added to episode.html
+    match = _TRANSCRIPT_RE.search(html)
+    return match.group(1).strip() if match else None
+
+def transcript_text(segments):
+    """Plain text of a transcript, as it reads on the episode page."""
+    parts = (f"{s.get('speaker', '')} {s.get('start_fmt', '')} {s.get('text', '')}" for s in segments)
+    return ' '.join(' '.join(parts).split())
+
+def html_transcript_text(transcript_html):
+    """Strips the tags from transcript markup, leaving search index text."""
+    # The tag regex is cheap; collapsing whitespace with split/join is ~4x
+    # faster than a \s+ substitution on a full transcript
+    return ' '.join(_TAG_RE.sub(' ', transcript_html).split())
+
+def text_path(feed_slug, slug):
+    """Where the plain text of an episode's transcript is cached."""
+    return os.path.join(TEXT_DIR, feed_slug, f"{slug}.txt")
+
+def save_episode_text(feed_slug, slug, text):
+    os.makedirs(os.path.join(TEXT_DIR, feed_slug), exist_ok=True)
+    with open(text_path(feed_slug, slug), 'w', encoding='utf-8') as f:
+        f.write(text)
 
 def get_episode_content(episode_data):
     try:
         path = os.path.join(EPISODES_DIR, episode_data['feed_slug'], f"{episode_data['slug']}.html")
+        # Plain text is cached when the page is rendered
+        txt_path = text_path(episode_data['feed_slug'], episode_data['slug'])
+        if os.path.exists(txt_path):
+            with open(txt_path, 'r', encoding='utf-8') as f:
+                return f.read()
+        # Episodes transcribed before the .txt files existed
         if not os.path.exists(path): return ""
         with open(path, 'r') as f:
             html = f.read()
-        match = re.search(r'<div class="transcript-container" id="transcript">(.*?)</div>\s*<script>', html, re.DOTALL)
-        if match:
-            # Strip tags for search index text
-            text = re.sub('<[^<]+?>', ' ', match.group(1))
-            return re.sub(r'\s+', ' ', text).strip()
-        return ""
+        transcript_html = extract_transcript_html(html)
+        return html_transcript_text(transcript_html) if transcript_html else ""
     except: return ""
 
 def render_html(template_name, context, output_path):
-    env = Environment(loader=FileSystemLoader(os.path.join(os.path.dirname(__file__), 'templates')))
-    template = env.get_template(template_name)
-    content = template.render(context)
-    with open(output_path, 'w') as f:
-        f.write(content)
-
-def generate_site(db, config):
-    """Regenerates all site pages (Index, Podcasts, Search, RSS)."""
+    template = _JENV.get_template(template_name)
+    # Stream chunks straight to disk instead of building the whole page in memory
+    stream = template.stream(context)
+    stream.enable_buffering(size=16)
+    with open(output_path, 'w', buffering=1024*1024) as f:
+        stream.dump(f)
+
+def generate_site(db, config, changed_feeds=None):
+    """Regenerates all site pages (Index, Podcasts, Search, RSS).
+
+    If `changed_feeds` (a set of feed slugs) is given, only those podcasts'
+    pages and RSS feeds are re-rendered; the global pages always are.
+    """
     print("Regenerating site structure...")
     
+    # db['episodes'] is kept in insertion order; sort newest first once here
+    episodes = sorted(db['episodes'], key=episode_sort_key, reverse=True)
+    
     # 1. Recent Episodes (Index)
-    recent_episodes = db['episodes'][:20]
+    recent_episodes = episodes[:20]
     render_html('index.html', 
                {"site": config['site_settings'], "episodes": recent_episodes, "relative_path": ""}, 
                os.path.join(OUTPUT_DIR, 'index.html'))
 
     # 2. Podcasts Page & Individual Podcast Pages
     podcasts_data = {}
+    feed_url_by_slug = {slugify(f['name']): f['url'] for f in config['feeds']}
     
     # Group episodes by feed
-    for ep in db['episodes']:
+    for ep in episodes:
         feed_slug = ep.get('feed_slug', 'unknown')
         if feed_slug not in podcasts_data:
             podcasts_data[feed_slug] = {
@@ -117,52 +236,63 @@ def generate_site(db, config):
                 "image": ep.get('feed_image'),
                 "episodes": [],
                 "count": 0,
-                "rss_url": next((f['url'] for f in config['feeds'] if slugify(f['name']) == feed_slug), "#"),
-                "source_url": next((f['url'] for f in config['feeds'] if slugify(f['name']) == feed_slug), "#")
+                "rss_url": feed_url_by_slug.get(feed_slug, "#"),
+                "source_url": feed_url_by_slug.get(feed_slug, "#"),
+                "generated_rss": f"podcasts/{feed_slug}.xml"
             }
         podcasts_data[feed_slug]['episodes'].append(ep)
         podcasts_data[feed_slug]['count'] += 1
 
-    # Render "All Podcasts" list
+    # Render "All Podcasts" list (RSS links are known up front, so once is enough)
     render_html('podcasts.html', 
                {"site": config['site_settings'], "podcasts": podcasts_data, "relative_path": ""}, 
                os.path.join(OUTPUT_DIR, 'podcasts.html'))
 
+    # Transcript text feeds both the RSS items and the search index, so each
+    # episode's is read once. Reading is mostly file IO, so it is spread over a few threads
+    with ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1)) as ex:
+        texts = ex.map(get_episode_content, episodes)
+        content_by_key = {(ep['feed_slug'], ep['slug']): text for ep, text in zip(episodes, texts)}
+
+    # RSS <item> blocks are the same in the per-podcast and global feeds,
+    # so each one is rendered once and spliced into both
+    item_template = _JENV.get_template('rss_item.xml')
+    rss_items = {}
+    def rss_item(ep):
+        key = (ep['feed_slug'], ep['slug'])
+        if key not in rss_items:
+            rss_items[key] = item_template.render(site=config['site_settings'], episode=ep, content=content_by_key[key])
+        return rss_items[key]
+
     # 3. Individual Podcast Pages & RSS Feeds
-    for feed_slug, data in podcasts_data.items():
+    def render_podcast(feed_slug, data):
         # Podcast HTML
         render_html('podcast.html', 
                    {"site": config['site_settings'], "feed": data, "episodes": data['episodes'], "relative_path": "../"}, 
                    os.path.join(PODCASTS_DIR, f"{feed_slug}.html"))
         
         # Podcast RSS
-        # Ensure content is loaded
-        for ep in data['episodes']:
-            if 'content' not in ep: ep['content'] = get_episode_content(ep)
-            
         rss_context = {
             "site": {
                 "title": f"{data['name']} - Podtext",
                 "base_url": config['site_settings']['base_url']
             },
-            "episodes": data['episodes'],
+            "items": [rss_item(ep) for ep in data['episodes']],
             "build_date": formatdate()
         }
         render_html('rss.xml', rss_context, os.path.join(PODCASTS_DIR, f"{feed_slug}.xml"))
-        
-        data['generated_rss'] = f"podcasts/{feed_slug}.xml"
 
-    # Re-render podcasts.html with the new RSS links
-    render_html('podcasts.html', 
-               {"site": config['site_settings'], "podcasts": podcasts_data, "relative_path": ""}, 
-               os.path.join(OUTPUT_DIR, 'podcasts.html'))
+    to_render = [(slug, data) for slug, data in podcasts_data.items()
+                 if changed_feeds is None or slug in changed_feeds]
+    # Each podcast touches only its own episodes and files, so they render side by side
+    with ThreadPoolExecutor(max_workers=min(4, len(to_render)) or 1) as ex:
+        list(ex.map(lambda item: render_podcast(*item), to_render))
 
     # 4. Search Index
     print("Building search index...")
     search_index = []
-    # Index recent 50 episodes to keep size manageable, or all if small
-    for ep in db['episodes']:
-        content_text = get_episode_content(ep)
+    for ep in episodes:
+        content_text = content_by_key[(ep['feed_slug'], ep['slug'])]
         search_index.append({
             "title": ep['title'],
             "feed": ep['feed_name'],
@@ -170,51 +300,83 @@ def generate_site(db, config):
             "text": content_text[:1000] # Index first 1000 chars for snippet
         })
     
-    with open(os.path.join(OUTPUT_DIR, 'search.json'), 'w') as f:
-        json.dump(search_index, f)
+    # orjson writes compact UTF-8, so Hebrew isn't inflated to \uXXXX escapes
+    with open(os.path.join(OUTPUT_DIR, 'search.json'), 'wb') as f:
+        f.write(orjson.dumps(search_index))
 
     # 5. RSS Feed
     rss_context = {
         "site": config['site_settings'],
-        "episodes": recent_episodes,
+        "items": [rss_item(ep) for ep in recent_episodes],
         "build_date": formatdate()
     }
-    # Hack: Add content for RSS
-    for ep in rss_context['episodes']:
-        if 'content' not in ep: ep['content'] = get_episode_content(ep)
-        
+
     render_html('rss.xml', rss_context, os.path.join(OUTPUT_DIR, 'rss.xml'))
 
     # 6. Copy Assets
-    import shutil
-    shutil.copy(os.path.join(os.path.dirname(__file__), 'templates', 'styles.css'), os.path.join(OUTPUT_DIR, 'styles.css'))
-    shutil.copy(os.path.join(os.path.dirname(__file__), 'templates', 'search.js'), os.path.join(OUTPUT_DIR, 'search.js'))
+    for asset in ('styles.css', 'search.js'):
+        shutil.copy(os.path.join(TEMPLATES_DIR, asset), os.path.join(OUTPUT_DIR, asset))
 
 # ... (Keep existing download/upload/process functions) ...
 # I need to re-implement them or just reference them if I could partial edit, 
 # but I'm rewriting the file. I will paste the previous helper functions here.
 
-def download_file(url, filepath):
+def fetch_feed(url, state, limit=MAX_ENTRIES):
+    """Fetches and parses a feed. Returns (parsed, validators), or (None, state) if unchanged."""
+    headers = {}
+    if state.get('etag'): headers['If-None-Match'] = state['etag']
+    if state.get('modified'): headers['If-Modified-Since'] = state['modified']
+    response = _SESSION.get(url, headers=headers, timeout=30)
+    if response.status_code == 304: return None, state
+    response.raise_for_status()
+    
+    # Only the newest entries are ever looked at, so cut the document after
+    # them instead of letting feedparser walk a feed's whole back catalogue
+    raw = response.content
+    end = -1
+    for _ in range(limit):
+        end = raw.find(b'</item>', end + 1)
+        if end == -1: break
+    if end != -1:
+        raw = raw[:end + len(b'</item>')] + b'</channel></rss>'
+    
+    d = feedparser.parse(raw, response_headers={
+        # The final URL after redirects, so relative links resolve against it
+        'content-location': response.url,
+        'content-type': response.headers.get('content-type', 'application/rss+xml')
+    })
+    return d, {"etag": response.headers.get('etag'), "modified": response.headers.get('last-modified')}
+
+def download_audio(url):
+    """Downloads an episode into memory and returns it as a BytesIO."""
     print(f"Downloading {url}...")
-    response = requests.get(url, stream=True)
+    response = _SESSION.get(url, stream=True, timeout=(5, 60))
+    response.raise_for_status()
     total_size = int(response.headers.get('content-length', 0))
-    with open(filepath, 'wb') as f:
-        with tqdm(total=total_size, unit='iB', unit_scale=True, desc="Downloading") as pbar:
-            for chunk in response.iter_content(chunk_size=8192):
-                if chunk: f.write(chunk); pbar.update(len(chunk))
-    return filepath
-
-def upload_to_gemini(path):
-    print(f"Uploading {path} to Gemini...")
-    file = client.files.upload(file=path)
+    audio = io.BytesIO()
+    # A progress bar is only useful when the server tells us the size
+    with tqdm(total=total_size, unit='iB', unit_scale=True, desc="Downloading", mininterval=0.5, disable=not total_size) as pbar:
+        for chunk in response.iter_content(chunk_size=1024*1024):
+            if chunk: audio.write(chunk); pbar.update(len(chunk))
+    audio.seek(0)
+    return audio
+
+def upload_to_gemini(audio):
+    print("Uploading audio to Gemini...")
+    file = client.files.upload(file=audio, config={"mime_type": "audio/mpeg"})
+    # Short episodes are usually ready within a second, so start polling fast
+    # and back off (with jitter) for long ones
+    delay = 0.25
+    deadline = time.monotonic() + 600
     while file.state.name == "PROCESSING":
-        time.sleep(2)
+        if time.monotonic() > deadline: raise TimeoutError(f"Gemini still processing {file.name} after 600s")
+        time.sleep(delay + random.uniform(0, 0.1))
+        delay = min(delay * 2, 5.0)
         file = client.files.get(name=file.name)
     if file.state.name != "ACTIVE": raise Exception(f"Upload failed: {file.state.name}")
     return file
 
-def process_with_gemini(audio_file):
-    prompt = """
+_TRANSCRIPTION_PROMPT = """
     You are a professional podcast transcriber and editor.
     
     Task:
@@ -241,32 +403,173 @@ def process_with_gemini(audio_file):
     
     IMPORTANT: Return ONLY the valid JSON object. Ensure all strings are properly escaped.
     """
+
+def process_with_gemini(audio_file, model=DEFAULT_MODEL):
     max_retries = 3
     for attempt in range(max_retries):
         try:
+            # Only the uploaded file's reference is sent, so retries never re-send the audio
             response = client.models.generate_content(
-                model="gemini-3-flash-preview",
-                contents=[audio_file, prompt],
+                model=model,
+                contents=[audio_file, _TRANSCRIPTION_PROMPT],
                 config=types.GenerateContentConfig(response_mime_type="application/json")
             )
             text = response.text.strip()
             if text.startswith("```json"): text = text[7:-3]
-            data = json.loads(text)
+            data = orjson.loads(text)
             if isinstance(data, list): return {"language": "en", "segments": data}
             return data
+        except genai_errors.ClientError as e:
+            # Bad request, missing file, auth... won't improve on retry. Rate limits will
+            if e.code != 429: raise
         except Exception:
-            time.sleep(2)
+            pass  # Server errors and malformed JSON are usually transient
+        if attempt < max_retries - 1: time.sleep(2 ** attempt)
     raise Exception("Gemini processing failed")
 
-def git_sync(processed_ids, episode_title=None, file_path=None):
-    if not subprocess.run(["git", "status", "--porcelain"], capture_output=True).stdout: return
-    print("Syncing...")
+def git_sync(processed_ids, episode_titles=None, file_path=None):
     files = ["db.json", "docs/"]
-    if file_path: files.append(file_path)
-    subprocess.run(["git", "add"] + files, check=True)
-    msg = f'New transcript: {episode_title}' if episode_title else f"Update site: {datetime.now()}"
-    subprocess.run(["git", "commit", "-m", msg], check=True)
-    subprocess.run(["git", "push"], check=True)
+    if file_path: files.append(os.path.relpath(file_path, BASE_DIR))
+    if not episode_titles:
+        msg = f"Update site: {datetime.now()}"
+    elif len(episode_titles) == 1:
+        msg = f'New transcript: {episode_titles[0]}'
+    else:
+        msg = f"New transcripts ({len(episode_titles)}):\n\n" + "\n".join(f"- {t}" for t in episode_titles)
+    
+    if pygit2:
+        # Stage and commit in-process through libgit2 instead of forking git
+        repo = pygit2.Repository(BASE_DIR)
+        if not repo.status(): return
+        print("Syncing...")
+        index = repo.index
+        index.add_all([f.rstrip('/') for f in files])
+        index.write()
+        tree = index.write_tree()
+        if tree == repo.head.peel(pygit2.Tree).id: return
+        sig = repo.default_signature
+        repo.create_commit('HEAD', sig, sig, msg, tree, [repo.head.target])
+    else:
+        if not subprocess.run(["git", "status", "--porcelain"], capture_output=True, cwd=BASE_DIR).stdout: return
+        print("Syncing...")
+        subprocess.run(["git", "add"] + files, check=True, cwd=BASE_DIR)
+        subprocess.run(["git", "commit", "-m", msg], check=True, cwd=BASE_DIR)
+    
+    # Push through the CLI so the user's configured credential helpers still apply
+    subprocess.run(["git", "push"], check=True, cwd=BASE_DIR)
+
+def get_uploaded_file(name):
+    """Returns a previously uploaded Gemini file if it is still usable, else None."""
+    try:
+        file = client.files.get(name=name)
+    except genai_errors.APIError:
+        return None  # Expired (files live ~48h) or deleted
+    return file if file.state.name == "ACTIVE" else None
+
+def delete_uploaded_file(name):
+    """Deletes a Gemini upload; failures are only logged (files expire anyway)."""
+    try:
+        client.files.delete(name=name)
+    except Exception as e:
+        print(f"Could not delete Gemini file {name}: {e}")
+
+def process_episode(job, config, gemini_slots):
+    """Downloads, transcribes and renders a single episode. Returns its db record.
+
+    `gemini_slots` is a semaphore capping concurrent Gemini upload+transcribe
+    calls across episodes; downloads are not limited by it.
+
+    While an upload is live its Gemini file name is kept in tmp/uploads/<digest>,
+    so a run that died between upload and transcription reuses the file
+    instead of re-uploading.
+    """
+    entry = job['entry']
+    print(f"Processing: {entry.title}")
+    
+    # The MP3 stays in memory: it is hashed and uploaded without a temp file
+    audio = download_audio(job['audio_url'])
+    
+    # Transcripts are cached by audio content, so re-runs of the same
+    # audio (e.g. after fix_db_state) skip Gemini entirely
+    with audio.getbuffer() as view:
+        digest = hashlib.blake2b(view).hexdigest()
+    cache_path = os.path.join(TRANSCRIPTS_DIR, f"{digest}.json")
+    
+    if os.path.exists(cache_path):
+        print(f"Using cached transcript for {entry.title}")
+        with open(cache_path, 'rb') as f:
+            result = orjson.loads(f.read())
+    else:
+        upload_path = os.path.join(UPLOADS_DIR, digest)
+        with gemini_slots:
+            gemini_file = None
+            if os.path.exists(upload_path):
+                with open(upload_path, 'r') as f:
+                    gemini_file = get_uploaded_file(f.read().strip())
+            if gemini_file:
+                print(f"Reusing uploaded audio for {entry.title}")
+            else:
+                # Written straight away (overwriting a stale name), so it survives
+                # a crash or SIGKILL during transcription
+                gemini_file = upload_to_gemini(audio)
+                with open(upload_path, 'w') as f:
+                    f.write(gemini_file.name)
+            try:
+                result = process_with_gemini(gemini_file, config.get('gemini_model', DEFAULT_MODEL))
+            except Exception:
+                # A failed episode is not retried, so its upload would never be reused
+                delete_uploaded_file(gemini_file.name)
+                os.remove(upload_path)
+                raise
+            # Cache before cleaning up, so a failed delete can't lose a paid-for transcript
+            if result.get('segments'):
+                with open(cache_path, 'wb') as f:
+                    f.write(orjson.dumps(result))
+            delete_uploaded_file(gemini_file.name)
+            os.remove(upload_path)
+    
+    segments = result.get('segments', [])
+    if not segments: raise Exception("Empty transcript")
+    
+    lang = result.get('language', 'en')
+    direction = "rtl" if lang == 'he' else "ltr"
+    
+    # 5. Build HTML
+    hebrew_date = format_hebrew_date(entry.published_parsed)
+    
+    episode_data = {
+        "title": entry.title,
+        "published_date": hebrew_date,
+        "audio_url": job['audio_url'],
+        "slug": job['slug'],
+        "feed_name": job['feed_name'],
+        "feed_slug": job['feed_slug'],
+        "feed_image": job['feed_image'],
+        "css_path": "../../styles.css",
+        "home_path": "../../index.html"
+    }
+    
+    for s in segments: s['start_fmt'] = s.get('timestamp', '')
+    
+    render_html('episode.html', 
+               {"site": config['site_settings'], "episode": episode_data, "segments": segments, "direction": direction, "relative_path": "../../"}, 
+               job['html_path'])
+    
+    if os.path.getsize(job['html_path']) < 500: raise Exception("File too small")
+    
+    # Search and RSS read this instead of stripping the page's HTML again
+    save_episode_text(job['feed_slug'], job['slug'], transcript_text(segments))
+    
+    return {
+        "guid": job['guid'],
+        "title": entry.title,
+        "published_date": hebrew_date,
+        "published_ts": calendar.timegm(entry.published_parsed) if entry.get('published_parsed') else 0,
+        "slug": job['slug'],
+        "feed_name": job['feed_name'],
+        "feed_slug": job['feed_slug'],
+        "feed_image": job['feed_image']
+    }
 
 def main():
     if not client: return
@@ -275,89 +578,144 @@ def main():
     processed_ids = set(db['processed'])
     failed_ids = set(db.get('failed', []))
     
-    for feed_conf in config['feeds']:
-        d = feedparser.parse(feed_conf['url'])
+    new_titles = []
+    changed_feeds = set()
+    
+    # Conditional GET: feeds unchanged since the last completed run answer 304
+    feed_state = db['feed_state']
+    def fetch(fc):
+        try:
+            return (fc, *fetch_feed(fc['url'], feed_state.get(fc['url'], {})))
+        except requests.RequestException as e:
+            print(f"Failed to fetch {fc['name']}: {e}")
+            return fc, None, {}
+    
+    # Fetch all feeds concurrently; this is network-bound so threads are enough
+    feeds = config['feeds']
+    with ThreadPoolExecutor(max_workers=max(1, min(16, len(feeds)))) as ex:
+        parsed = list(ex.map(fetch, feeds))
+    
+    # Collect every unprocessed episode across all feeds
+    jobs = []
+    queued_paths = set()
+    # Pages of episodes already in the db, so known entries need no slugify
+    known_pages = {ep['guid']: os.path.join(EPISODES_DIR, ep['feed_slug'], f"{ep['slug']}.html")
+                   for ep in db['episodes'] if ep.get('guid')}
+    new_feed_state = {}
+    pending_feeds = set()
+    for feed_conf, d, validators in parsed:
+        if d is None: continue
+        if validators.get('etag') or validators.get('modified'):
+            new_feed_state[feed_conf['url']] = validators
+        
         feed_image = d.feed.get('image', {}).get('href')
+        # Feeds list newest first, so after a completed run the first known episode
+        # means the rest are known too. A feed's state is dropped while it has
+        # queued episodes (see below), and fix_db_state/cleanup_failures clear
+        # feed_state when they un-mark episodes, both forcing a full scan.
+        full_scan = feed_conf['url'] not in feed_state or not feed_conf.get('chronological', True)
+        feed_slug = slugify(feed_conf['name'])
+        feed_dir = os.path.join(EPISODES_DIR, feed_slug)
         
-        for entry in d.entries[:200]:
+        for entry in d.entries[:MAX_ENTRIES]:
             guid = entry.id
-            slug = slugify(entry.title)
-            feed_slug = slugify(feed_conf['name'])
-            feed_dir = os.path.join(EPISODES_DIR, feed_slug)
-            html_path = os.path.join(feed_dir, f"{slug}.html")
-            
-            if guid in processed_ids and os.path.exists(html_path): continue
+            if guid in processed_ids:
+                page = known_pages.get(guid) or os.path.join(feed_dir, f"{slugify(entry.title)}.html")
+                if os.path.exists(page):
+                    if not full_scan: break
+                    continue
             if guid in failed_ids: continue
             
-            print(f"Processing: {entry.title}")
-            # ... (Download/Process Logic) ...
-            # For brevity in this rewrite, I'll paste the core logic back
-            # Real implementation below:
+            slug = slugify(entry.title)
+            html_path = os.path.join(feed_dir, f"{slug}.html")
+            # Two entries with the same title would share temp and output files
+            if html_path in queued_paths: continue
             
             audio_url = next((l.href for l in entry.links if l.type == 'audio/mpeg'), None)
             if not audio_url: continue
             
             os.makedirs(feed_dir, exist_ok=True)
-            temp_mp3 = os.path.join(TEMP_DIR, f"{slug}.mp3")
-            
+            queued_paths.add(html_path)
+            pending_feeds.add(feed_conf['url'])
+            jobs.append({
+                "guid": guid,
+                "entry": entry,
+                "audio_url": audio_url,
+                "slug": slug,
+                "feed_name": feed_conf['name'],
+                "feed_slug": feed_slug,
+                "feed_image": feed_image,
+                "html_path": html_path
+            })
+    
+    # Nothing queued: only write db.json if a feed's validators changed, so
+    # idle cron runs leave the file (and its mtime) untouched
+    if not jobs:
+        if any(feed_state.get(url) != v for url, v in new_feed_state.items()):
+            feed_state.update(new_feed_state)
+            save_db(db)
+        return
+    
+    # Until every queued episode is handled these feeds must be fully rescanned:
+    # an interrupted run would otherwise stop next time at the first episode
+    # it did finish and never queue the ones after it
+    for url in pending_feeds: feed_state.pop(url, None)
+    save_db(db)
+    
+    # Episodes are independent and mostly waiting on the network or Gemini,
+    # so a few run concurrently. db is only touched from this thread.
+    # With more workers than Gemini slots, the next downloads overlap the
+    # current transcriptions without raising the API load.
+    # db.json is written once per run rather than after every episode
+    workers = config.get('max_workers', 2)
+    gemini_slots = threading.BoundedSemaphore(config.get('gemini_concurrency', workers))
+    
+    def record(job, future):
+        try:
+            ep_record = future.result()
+        except Exception as e:
+            print(f"Failed: {e}")
+            db['failed'].append(job['guid'])
+            return
+        
+        # 6. Update DB
+        db['processed'].append(job['guid'])
+        processed_ids.add(job['guid'])
+        db['episodes'].append(ep_record)
+        new_titles.append(ep_record['title'])
+        changed_feeds.add(ep_record['feed_slug'])
+    
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            futures = {ex.submit(process_episode, job, config, gemini_slots): job for job in jobs}
+            pending = set(futures)
             try:
-                download_file(audio_url, temp_mp3)
-                gemini_file = upload_to_gemini(temp_mp3)
-                result = process_with_gemini(gemini_file)
-                client.files.delete(name=gemini_file.name)
-                
-                segments = result.get('segments', [])
-                if not segments: raise Exception("Empty transcript")
-                
-                lang = result.get('language', 'en')
-                direction = "rtl" if lang == 'he' else "ltr"
-                
-                # 5. Build HTML
-                hebrew_date = format_hebrew_date(entry.published_parsed)
-                
-                episode_data = {
-                    "title": entry.title,
-                    "published_date": hebrew_date,
-                    "audio_url": audio_url,
-                    "slug": slug,
-                    "feed_name": feed_conf['name'],
-                    "feed_slug": feed_slug,
-                    "feed_image": feed_image,
-                    "css_path": "../../styles.css",
-                    "home_path": "../../index.html"
-                }
-                
-                for s in segments: s['start_fmt'] = s.get('timestamp', '')
-                
-                render_html('episode.html', 
-                           {"site": config['site_settings'], "episode": episode_data, "segments": segments, "direction": direction, "relative_path": "../../"}, 
-                           html_path)
-                
-                if os.path.getsize(html_path) < 500: raise Exception("File too small")
-                
-                # 6. Update DB
-                db['processed'].append(guid)
-                db['episodes'].insert(0, {
-                    "title": entry.title,
-                    "published_date": hebrew_date,
-                    "slug": slug,
-                    "feed_name": feed_conf['name'],
-                    "feed_slug": feed_slug,
-                    "feed_image": feed_image
-                })
-                save_db(db)
-                
-                # Regenerate entire site structure
-                generate_site(db, config)
-                
-                git_sync(db['processed'], entry.title, html_path)
-                
-            except Exception as e:
-                print(f"Failed: {e}")
-                db['failed'].append(guid)
-                save_db(db)
-            finally:
-                if os.path.exists(temp_mp3): os.remove(temp_mp3)
+                for future in as_completed(futures):
+                    pending.discard(future)
+                    record(futures[future], future)
+            except BaseException:
+                # Ctrl-C: drop the queued episodes, let the in-flight ones finish
+                # and keep the ones that succeeded (failures are retried next run)
+                ex.shutdown(wait=True, cancel_futures=True)
+                for future in pending:
+                    if not future.cancelled() and future.exception() is None:
+                        record(futures[future], future)
+                raise
+        
+        # Only remember the feed validators once every queued episode was handled,
+        # so an interrupted run re-reads the feeds next time
+        feed_state.update(new_feed_state)
+    finally:
+        save_db(db)
+    
+    # Nothing new transcribed: leave the site and the repo untouched
+    if not new_titles: return
+    
+    # Regenerate the site once for the whole batch, touching only the
+    # podcasts that actually got new episodes
+    generate_site(db, config, changed_feeds)
+    
+    git_sync(db['processed'], new_titles)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file